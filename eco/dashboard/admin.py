@@ -26,16 +26,19 @@ class ZoneAdmin(admin.ModelAdmin):
 
 class DeviceAdmin(admin.ModelAdmin):
     list_display = ('name', 'category', 'zone', 'max_consumption', 'status')
+    list_select_related = ('category', 'zone')
     list_filter = ('category', 'zone', 'status')
     search_fields = ('name',)
 
 class MeasurementAdmin(admin.ModelAdmin):
     list_display = ('device', 'value', 'timestamp', 'status')
+    list_select_related = ('device',)
     list_filter = ('device', 'status')
     date_hierarchy = 'timestamp'
 
 class AlertAdmin(admin.ModelAdmin):
     list_display = ('device', 'alert_type', 'is_resolved', 'status')
+    list_select_related = ('device',)
     list_filter = ('alert_type', 'is_resolved', 'status')
     search_fields = ('message',)
 
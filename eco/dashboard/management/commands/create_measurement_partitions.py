@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from dashboard.partitions import create_upcoming_partitions
+
+
+class Command(BaseCommand):
+    help = "Crea las particiones mensuales de dashboard_measurement (programar mensualmente, p. ej. con cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months', type=int, default=3,
+            help="Cantidad de meses a crear a partir del actual (por defecto 3).",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stdout.write("dashboard_measurement solo está particionada en PostgreSQL; nada que crear.")
+            return
+        for month in create_upcoming_partitions(options['months']):
+            self.stdout.write(self.style.SUCCESS(f"Partición {month:%Y-%m} lista."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.models import DeviceSummary
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresca la vista materializada dashboard_org_summary (programar cada minuto, p. ej. con cron). "
+        "Los cambios de dispositivos, categorías y zonas también la refrescan, con un límite de frecuencia "
+        "(dashboard/signals.py)."
+    )
+
+    def handle(self, *args, **options):
+        if not DeviceSummary.refresh():
+            # En otros motores dashboard_org_summary es una vista simple, siempre actualizada
+            self.stdout.write("dashboard_org_summary no es materializada en este motor; nada que refrescar.")
+            return
+        self.stdout.write(self.style.SUCCESS("dashboard_org_summary actualizada."))
@@ -0,0 +1,15 @@
+class OrganizationMiddleware:
+    """
+    Expone request.organization_id a partir de la sesión, sin consultar la tabla Organization.
+    Debe ir después de SessionMiddleware.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # Sin cookie de sesión no hay nada que cargar del backend de sesiones
+        if request.session.session_key is None:
+            request.organization_id = None
+        else:
+            request.organization_id = request.session.get('organization_id')
+        return self.get_response(request)
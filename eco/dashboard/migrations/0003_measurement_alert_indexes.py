@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-15 21:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0002_device_organization_alter_device_max_consumption_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['device', '-created_at'], name='alert_device_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='measurement',
+            index=models.Index(fields=['device', '-timestamp'], name='meas_device_ts_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-15 21:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_organization(apps, schema_editor):
+    Device = apps.get_model('dashboard', 'Device')
+    device_org = Subquery(Device.objects.filter(pk=OuterRef('device_id')).values('organization_id')[:1])
+    for model_name in ('Measurement', 'Alert'):
+        apps.get_model('dashboard', model_name).objects.update(organization_id=device_org)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0003_measurement_alert_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alert',
+            name='organization',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='dashboard.organization'),
+        ),
+        migrations.AddField(
+            model_name='measurement',
+            name='organization',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='measurements', to='dashboard.organization'),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['organization', '-created_at'], name='alert_org_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='measurement',
+            index=models.Index(fields=['organization', '-timestamp'], name='meas_org_ts_idx'),
+        ),
+        migrations.RunPython(backfill_organization, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-15 21:35
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def backfill_timestamp_str(apps, schema_editor):
+    Measurement = apps.get_model('dashboard', 'Measurement')
+    pendientes = []
+    for m in Measurement.objects.only('id', 'timestamp').iterator(chunk_size=2000):
+        m.timestamp_str = m.timestamp.strftime("%Y-%m-%d %H:%M:%S")
+        pendientes.append(m)
+        if len(pendientes) >= 2000:
+            Measurement.objects.bulk_update(pendientes, ['timestamp_str'])
+            pendientes = []
+    if pendientes:
+        Measurement.objects.bulk_update(pendientes, ['timestamp_str'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0004_measurement_alert_organization'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='measurement',
+            name='timestamp_str',
+            field=models.CharField(default='', editable=False, max_length=19),
+        ),
+        migrations.AlterField(
+            model_name='measurement',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.RunPython(backfill_timestamp_str, migrations.RunPython.noop),
+    ]
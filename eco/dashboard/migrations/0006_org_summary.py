@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-15 21:36
+
+from django.db import migrations, models
+
+SUMMARY_SELECT = """
+    SELECT d.organization_id, d.category_id, c.name AS category_name,
+           d.zone_id, z.name AS zone_name, COUNT(*) AS device_count
+    FROM dashboard_device d
+    JOIN dashboard_category c ON c.id = d.category_id
+    JOIN dashboard_zone z ON z.id = d.zone_id
+    WHERE d.organization_id IS NOT NULL
+    GROUP BY d.organization_id, d.category_id, c.name, d.zone_id, z.name
+"""
+
+
+def create_summary_view(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f"CREATE MATERIALIZED VIEW dashboard_org_summary AS {SUMMARY_SELECT}")
+        # Índice único requerido por REFRESH MATERIALIZED VIEW CONCURRENTLY
+        schema_editor.execute(
+            "CREATE UNIQUE INDEX dashboard_org_summary_pk "
+            "ON dashboard_org_summary (organization_id, category_id, zone_id)"
+        )
+    else:
+        schema_editor.execute(f"CREATE VIEW dashboard_org_summary AS {SUMMARY_SELECT}")
+
+
+def drop_summary_view(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("DROP MATERIALIZED VIEW IF EXISTS dashboard_org_summary")
+    else:
+        schema_editor.execute("DROP VIEW IF EXISTS dashboard_org_summary")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0005_measurement_timestamp_str'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeviceSummary',
+            fields=[
+                ('pk', models.CompositePrimaryKey('organization_id', 'category_id', 'zone_id', blank=True, editable=False, primary_key=True, serialize=False)),
+                ('organization_id', models.BigIntegerField()),
+                ('category_id', models.BigIntegerField()),
+                ('category_name', models.CharField(max_length=100)),
+                ('zone_id', models.BigIntegerField()),
+                ('zone_name', models.CharField(max_length=100)),
+                ('device_count', models.IntegerField()),
+            ],
+            options={
+                'db_table': 'dashboard_org_summary',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_summary_view, drop_summary_view),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations
+
+# Los índices por organización de Measurement y Alert pasan a ser "covering" (INCLUDE) para que las
+# consultas calientes del dashboard sean index-only scans. Se reemplazan con el mismo nombre, así el
+# estado de Django (Meta.indexes) no cambia y no queda un índice duplicado con las mismas claves.
+# Solo PostgreSQL soporta columnas no clave en índices; en otros motores quedan los índices simples.
+COVERING_INDEXES = [
+    (
+        "meas_org_ts_idx",
+        "dashboard_measurement (organization_id, timestamp DESC)",
+        "INCLUDE (value, timestamp_str, device_id)",
+    ),
+    (
+        "alert_org_created_idx",
+        "dashboard_alert (organization_id, created_at DESC)",
+        "INCLUDE (alert_type, is_resolved)",
+    ),
+]
+
+
+def create_covering_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, definition, include in COVERING_INDEXES:
+        schema_editor.execute(f"DROP INDEX {name}")
+        schema_editor.execute(f"CREATE INDEX {name} ON {definition} {include}")
+
+
+def drop_covering_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, definition, _ in COVERING_INDEXES:
+        schema_editor.execute(f"DROP INDEX {name}")
+        schema_editor.execute(f"CREATE INDEX {name} ON {definition}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0006_org_summary'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_covering_indexes, drop_covering_indexes),
+    ]
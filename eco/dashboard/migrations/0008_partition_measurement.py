@@ -0,0 +1,71 @@
+from datetime import date
+
+from django.db import migrations
+
+from dashboard.partitions import add_months, create_month_partition
+
+
+def partition_measurement(apps, schema_editor):
+    """
+    Convierte dashboard_measurement en una tabla particionada por mes (RANGE sobre timestamp).
+    Solo en PostgreSQL; en otros motores la tabla queda igual.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("ALTER TABLE dashboard_measurement RENAME TO dashboard_measurement_unpartitioned")
+        cursor.execute(
+            "CREATE TABLE dashboard_measurement ("
+            " LIKE dashboard_measurement_unpartitioned INCLUDING DEFAULTS INCLUDING IDENTITY"
+            ") PARTITION BY RANGE (timestamp)"
+        )
+        # La clave primaria de una tabla particionada debe incluir la columna de partición
+        cursor.execute("ALTER TABLE dashboard_measurement ADD PRIMARY KEY (id, timestamp)")
+
+        # Un mes por partición desde la medición más antigua hasta dos meses adelante
+        cursor.execute("SELECT MIN(timestamp) FROM dashboard_measurement_unpartitioned")
+        oldest = cursor.fetchone()[0]
+        month = add_months(oldest.date() if oldest else date.today(), 0)
+        last = add_months(date.today(), 2)
+        while month <= last:
+            create_month_partition(cursor, month)
+            month = add_months(month, 1)
+        cursor.execute("CREATE TABLE dashboard_measurement_default PARTITION OF dashboard_measurement DEFAULT")
+
+        cursor.execute("INSERT INTO dashboard_measurement SELECT * FROM dashboard_measurement_unpartitioned")
+        cursor.execute(
+            "SELECT setval(pg_get_serial_sequence('dashboard_measurement', 'id'), "
+            "COALESCE((SELECT MAX(id) FROM dashboard_measurement), 0) + 1, false)"
+        )
+        cursor.execute("DROP TABLE dashboard_measurement_unpartitioned")
+
+        # Restricciones e índices de la tabla original (se replican en cada partición)
+        cursor.execute(
+            "ALTER TABLE dashboard_measurement ADD CONSTRAINT dashboard_measurement_device_id_fk "
+            "FOREIGN KEY (device_id) REFERENCES dashboard_device (id) DEFERRABLE INITIALLY DEFERRED"
+        )
+        cursor.execute(
+            "ALTER TABLE dashboard_measurement ADD CONSTRAINT dashboard_measurement_organization_id_fk "
+            "FOREIGN KEY (organization_id) REFERENCES dashboard_organization (id) DEFERRABLE INITIALLY DEFERRED"
+        )
+        cursor.execute("CREATE INDEX dashboard_measurement_device_id_idx ON dashboard_measurement (device_id)")
+        cursor.execute("CREATE INDEX dashboard_measurement_organization_id_idx ON dashboard_measurement (organization_id)")
+        cursor.execute("CREATE INDEX meas_device_ts_idx ON dashboard_measurement (device_id, timestamp DESC)")
+        # Versión covering de 0007_covering_indexes
+        cursor.execute(
+            "CREATE INDEX meas_org_ts_idx ON dashboard_measurement "
+            "(organization_id, timestamp DESC) INCLUDE (value, timestamp_str, device_id)"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0007_covering_indexes'),
+    ]
+
+    operations = [
+        # Sin reversa: la tabla particionada sigue siendo compatible con el esquema anterior
+        migrations.RunPython(partition_measurement, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-15 21:40
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower, Trim
+
+
+def normalize_emails(apps, schema_editor):
+    Organization = apps.get_model('dashboard', 'Organization')
+    # Correos que solo difieren en mayúsculas/espacios chocarían con el índice único al normalizar:
+    # se informan todos juntos en lugar de fallar con un IntegrityError sobre el primero
+    duplicados = (
+        Organization.objects
+        .values(normalizado=Lower(Trim('email')))
+        .annotate(total=Count('id'))
+        .filter(total__gt=1)
+        .values_list('normalizado', flat=True)
+    )
+    conflictos = {
+        normalizado: list(
+            Organization.objects
+            .annotate(normalizado=Lower(Trim('email')))
+            .filter(normalizado=normalizado)
+            .values_list('id', 'email')
+        )
+        for normalizado in duplicados
+    }
+    if conflictos:
+        detalle = '\n'.join(
+            f"  {normalizado}: " + ', '.join(f"id={pk} ({email!r})" for pk, email in filas)
+            for normalizado, filas in conflictos.items()
+        )
+        raise RuntimeError(
+            "No se puede normalizar Organization.email: hay correos repetidos al ignorar "
+            f"mayúsculas y espacios. Unifícalos o cámbialos antes de migrar:\n{detalle}"
+        )
+    Organization.objects.update(email=Lower(Trim('email')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0008_partition_measurement'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='organization',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='org_email_lower_uniq', violation_error_message='Ya existe una organización con ese correo electrónico.'),
+        ),
+    ]
@@ -1,4 +1,10 @@
-from django.db import models
+from django.db import connection, models
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+# Formato con el que se muestran las fechas de las mediciones
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
 
 class BaseModel(models.Model):
     STATUS = [
@@ -35,24 +41,102 @@ class Zone(BaseModel):
 #dispositivo
 class Device(BaseModel):
     name = models.CharField(max_length=100)
-    category = models.ForeignKey(Category, on_delete=models.CASCADE)
-    zone = models.ForeignKey(Zone, on_delete=models.CASCADE)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, db_index=True)
+    zone = models.ForeignKey(Zone, on_delete=models.CASCADE, db_index=True)
     max_consumption = models.FloatField()  # Cambiado a FloatField para coincidir con Measurement
-    organization = models.ForeignKey('Organization', on_delete=models.CASCADE, related_name='devices', null=True, blank=True)
+    organization = models.ForeignKey('Organization', on_delete=models.CASCADE, related_name='devices', null=True, blank=True, db_index=True)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Organización cargada, para propagar a mediciones y alertas si cambia (ver signals)
+        if 'organization_id' in instance.__dict__:
+            instance._loaded_organization_id = instance.organization_id
+        return instance
 
     def __str__(self):
         return self.name
 
+class DeviceOrganizationQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        bulk_create() no pasa por save(): la copia de device.organization se completa aquí,
+        con una sola consulta para todos los dispositivos.
+        """
+        objs = list(objs)
+        pending = {obj.device_id for obj in objs if obj.organization_id is None}
+        if pending:
+            organizations = dict(Device.objects.filter(pk__in=pending).values_list('id', 'organization_id'))
+            for obj in objs:
+                if obj.organization_id is None:
+                    obj.organization_id = organizations.get(obj.device_id)
+        return super().bulk_create(objs, *args, **kwargs)
+
+
+class MeasurementQuerySet(DeviceOrganizationQuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        Igual que save(), formatea timestamp_str (si no, quedaría '' en las filas insertadas en lote).
+        """
+        objs = list(objs)
+        for obj in objs:
+            obj.timestamp_str = obj.timestamp.strftime(TIMESTAMP_FORMAT)
+        return super().bulk_create(objs, *args, **kwargs)
+
+
+class DeviceOrganizationCopy:
+    """
+    Mediciones y alertas guardan una copia de device.organization para filtrar por organización sin JOIN.
+    La copia se calcula en save() si falta o si cambió el dispositivo, y en bulk_create();
+    update() y bulk_update() no la tocan: quien cambie device por esa vía debe actualizar organization.
+    """
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Dispositivo cargado, para recalcular la organización si se reasigna
+        if 'device_id' in instance.__dict__:
+            instance._loaded_device_id = instance.device_id
+        return instance
+
+    def _copy_device_organization(self):
+        # Sin cambio de dispositivo se respeta la copia existente y se ahorra el SELECT del dispositivo
+        loaded_device_id = self.__dict__.get('_loaded_device_id', self.device_id)
+        if self.organization_id is None or self.device_id != loaded_device_id:
+            self.organization_id = self.device.organization_id
+
+
 # Mediciones
-class Measurement(BaseModel):
+class Measurement(DeviceOrganizationCopy, BaseModel):
     device = models.ForeignKey(Device, on_delete=models.CASCADE)
     value = models.FloatField()  # consumption value
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # default en lugar de auto_now_add para conocer la fecha antes del INSERT y formatearla en save()
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
+    # Fecha ya formateada con TIMESTAMP_FORMAT para no hacer strftime en cada request
+    # (se calcula en save() y en bulk_create(); un update() de timestamp debe actualizarlo también)
+    timestamp_str = models.CharField(max_length=19, editable=False, default='')
+    # Copia de device.organization para filtrar por organización sin JOIN a Device
+    organization = models.ForeignKey('Organization', on_delete=models.CASCADE, related_name='measurements', null=True, blank=True, db_index=True, editable=False)
+
+    objects = MeasurementQuerySet.as_manager()
+
+    class Meta:
+        # Índice para "últimas mediciones" por dispositivo (filtro + order_by('-timestamp'))
+        indexes = [
+            models.Index(fields=['device', '-timestamp'], name='meas_device_ts_idx'),
+            # En PostgreSQL se reemplaza por una versión covering (migración 0007)
+            models.Index(fields=['organization', '-timestamp'], name='meas_org_ts_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self._copy_device_organization()
+        self.timestamp_str = self.timestamp.strftime(TIMESTAMP_FORMAT)
+        super().save(*args, **kwargs)
+        self._loaded_device_id = self.device_id
     
     def __str__(self):
         return f"{self.device.name} - {self.timestamp}"
 
-class Alert(BaseModel):
+class Alert(DeviceOrganizationCopy, BaseModel):
     ALERT_TYPES = [
         ("HIGH_CONSUMPTION", "High Consumption"),
         ("DEVICE_FAILURE", "Device Failure"),
@@ -63,14 +147,99 @@ class Alert(BaseModel):
     alert_type = models.CharField(max_length=20, choices=ALERT_TYPES)
     message = models.TextField()
     is_resolved = models.BooleanField(default=False)
+    # Copia de device.organization para filtrar por organización sin JOIN a Device
+    organization = models.ForeignKey('Organization', on_delete=models.CASCADE, related_name='alerts', null=True, blank=True, db_index=True, editable=False)
+
+    objects = DeviceOrganizationQuerySet.as_manager()
+
+    class Meta:
+        # Índice para "alertas recientes" por dispositivo (filtro + order_by('-created_at'))
+        indexes = [
+            models.Index(fields=['device', '-created_at'], name='alert_device_created_idx'),
+            # En PostgreSQL se reemplaza por una versión covering (migración 0007)
+            models.Index(fields=['organization', '-created_at'], name='alert_org_created_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self._copy_device_organization()
+        super().save(*args, **kwargs)
+        self._loaded_device_id = self.device_id
     
     def __str__(self):
         return f"{self.device.name} - {self.alert_type}"
 
+class OrganizationManager(models.Manager):
+    def credentials_for(self, email):
+        """
+        (id, name, password) de la organización con ese email como namedtuple liviana, o None.
+        """
+        return (
+            self.filter(email=email.strip().lower())
+            .values_list('id', 'name', 'password', named=True)
+            .first()
+        )
+
+
 class Organization(BaseModel):
     name = models.CharField(max_length=100, unique=True)  # Añadido unique=True para evitar nombres duplicados
     email = models.EmailField(max_length=255, unique=True)
     password = models.CharField(max_length=128)  # Para almacenar contraseñas hasheadas
 
+    objects = OrganizationManager()
+
+    class Meta:
+        constraints = [
+            # Evita duplicados que solo difieren en mayúsculas; su índice sirve a las búsquedas por Lower(email)
+            models.UniqueConstraint(
+                Lower('email'),
+                name='org_email_lower_uniq',
+                violation_error_message='Ya existe una organización con ese correo electrónico.',
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Email cargado, para invalidar también las credenciales cacheadas con él si cambia (ver login/signals.py)
+        if 'email' in instance.__dict__:
+            instance._loaded_email = instance.email
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Los emails se guardan normalizados para que el login pueda buscar por igualdad exacta
+        self.email = self.email.strip().lower()
+        super().save(*args, **kwargs)
+
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+
+# Resumen de dispositivos por organización/categoría/zona.
+# En PostgreSQL es una vista materializada (manage.py refresh_org_summary); en otros motores, una vista simple.
+class DeviceSummary(models.Model):
+    """
+    Conteo de dispositivos por (organización, categoría, zona), leído de la vista dashboard_org_summary.
+    """
+    pk = models.CompositePrimaryKey('organization_id', 'category_id', 'zone_id')
+    organization_id = models.BigIntegerField()
+    category_id = models.BigIntegerField()
+    category_name = models.CharField(max_length=100)
+    zone_id = models.BigIntegerField()
+    zone_name = models.CharField(max_length=100)
+    device_count = models.IntegerField()
+
+    class Meta:
+        managed = False
+        db_table = 'dashboard_org_summary'
+
+    @classmethod
+    def refresh(cls):
+        """
+        Recalcula la vista materializada (solo PostgreSQL; en otros motores es una vista simple).
+        Devuelve False si no había nada que refrescar.
+        """
+        if connection.vendor != 'postgresql':
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {cls._meta.db_table}")
+        return True
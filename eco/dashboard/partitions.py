@@ -0,0 +1,62 @@
+from datetime import date
+
+from django.db import connection, transaction
+
+# dashboard_measurement está particionada por mes (RANGE sobre timestamp) en PostgreSQL.
+# Cada mes vive en dashboard_measurement_AAAA_MM; lo que no cae en ningún mes va a dashboard_measurement_default.
+MEASUREMENT_TABLE = 'dashboard_measurement'
+
+
+def add_months(day, months):
+    """
+    Primer día del mes que está `months` meses después (o antes, si es negativo) del mes de `day`.
+    """
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def create_month_partition(cursor, month):
+    """
+    Crea (si no existe) la partición de dashboard_measurement para el mes de `month`.
+    Si la partición por defecto ya recibió filas de ese mes (p. ej. porque no se corrió el cron a tiempo),
+    un CREATE TABLE ... PARTITION OF fallaría; por eso la tabla se crea suelta, se le mueven esas filas
+    y recién entonces se adjunta. Debe correr dentro de una transacción.
+    """
+    start = date(month.year, month.month, 1)
+    end = add_months(start, 1)
+    partition = f"{MEASUREMENT_TABLE}_{start:%Y_%m}"
+    default = f"{MEASUREMENT_TABLE}_default"
+
+    cursor.execute("SELECT to_regclass(%s), to_regclass(%s)", [partition, default])
+    partition_exists, default_exists = cursor.fetchone()
+    if partition_exists:
+        return
+
+    cursor.execute(f"CREATE TABLE {partition} (LIKE {MEASUREMENT_TABLE} INCLUDING DEFAULTS)")
+    if default_exists:
+        cursor.execute(
+            f"WITH moved AS ("
+            f" DELETE FROM {default} WHERE timestamp >= '{start}' AND timestamp < '{end}' RETURNING *"
+            f") INSERT INTO {partition} SELECT * FROM moved"
+        )
+    # ATTACH crea en la partición los índices y claves de la tabla padre
+    cursor.execute(
+        f"ALTER TABLE {MEASUREMENT_TABLE} ATTACH PARTITION {partition} "
+        f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    )
+
+
+def create_upcoming_partitions(months=3, today=None):
+    """
+    Crea las particiones del mes actual y de los `months - 1` siguientes.
+    No hace nada fuera de PostgreSQL (allí la tabla no está particionada).
+    """
+    if connection.vendor != 'postgresql':
+        return []
+    first = add_months(today or date.today(), 0)
+    created = [add_months(first, i) for i in range(months)]
+    with connection.cursor() as cursor:
+        for month in created:
+            with transaction.atomic():
+                create_month_partition(cursor, month)
+    return created
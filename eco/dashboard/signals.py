@@ -0,0 +1,127 @@
+import threading
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Category, Device, DeviceSummary, Measurement, Alert, Organization, Zone
+from .views import categories_cache_key, dashboard_cache_key, organization_cache_key
+
+
+# Mínimo de segundos entre refrescos de dashboard_org_summary disparados por cambios; lo que quede
+# pendiente en ese lapso lo recoge el refresco periódico (manage.py refresh_org_summary cada minuto)
+SUMMARY_REFRESH_MIN_INTERVAL = 30
+
+# Organizaciones con cambios aún sin refrescar, por hilo (y por lo tanto por conexión)
+_pending = threading.local()
+
+
+def _flush_summary_refresh():
+    organization_ids = getattr(_pending, 'organization_ids', None)
+    if not organization_ids:
+        # Otro callback de la misma transacción ya se llevó el conjunto
+        return
+    _pending.organization_ids = set()
+    if cache.add('org_summary:refreshed', True, SUMMARY_REFRESH_MIN_INTERVAL):
+        DeviceSummary.refresh()
+    # Después del refresco, para que el dashboard no vuelva a cachear conteos viejos
+    cache.delete_many([dashboard_cache_key(oid) for oid in organization_ids])
+
+
+def schedule_summary_refresh(organization_ids):
+    """
+    Anota las organizaciones afectadas y, al confirmar la transacción, refresca dashboard_org_summary
+    (a lo sumo una vez cada SUMMARY_REFRESH_MIN_INTERVAL) y borra su dashboard cacheado.
+    Cada guardado registra su callback porque un rollback descarta los anteriores; el primero que
+    corre se lleva todo el conjunto y los demás no hacen nada.
+    """
+    organization_ids = {oid for oid in organization_ids if oid}
+    if not organization_ids:
+        return
+    if getattr(_pending, 'organization_ids', None) is None:
+        _pending.organization_ids = set()
+    _pending.organization_ids.update(organization_ids)
+    transaction.on_commit(_flush_summary_refresh)
+
+
+@receiver([post_save, post_delete], sender=Measurement)
+@receiver([post_save, post_delete], sender=Alert)
+def invalidate_dashboard_cache(sender, instance, **kwargs):
+    """
+    Borra el contexto cacheado del dashboard de la organización afectada.
+    """
+    if instance.organization_id:
+        cache.delete(dashboard_cache_key(instance.organization_id))
+
+
+@receiver([post_save, post_delete], sender=Device)
+def refresh_device_summary(sender, instance, **kwargs):
+    """
+    Los conteos del dashboard y de devices_by_* salen de dashboard_org_summary.
+    """
+    schedule_summary_refresh([instance.organization_id])
+
+
+@receiver(post_save, sender=Device)
+def propagate_device_organization(sender, instance, created, **kwargs):
+    """
+    Mantiene la copia de organization de mediciones y alertas cuando el dispositivo cambia de organización.
+    """
+    if 'organization_id' not in instance.__dict__:
+        return
+    previous = instance.__dict__.get('_loaded_organization_id')
+    if not created and previous != instance.organization_id:
+        for model in (Measurement, Alert):
+            model.objects.filter(device=instance).update(organization_id=instance.organization_id)
+        # La organización anterior pierde el dispositivo: sus cachés también quedan viejas
+        if previous:
+            cache.delete(categories_cache_key(previous))
+            schedule_summary_refresh([previous])
+    instance._loaded_organization_id = instance.organization_id
+
+
+@receiver([post_save, post_delete], sender=Device)
+def invalidate_device_categories_cache(sender, instance, **kwargs):
+    """
+    Borra el listado de categorías cacheado de la organización del dispositivo.
+    """
+    if instance.organization_id:
+        cache.delete(categories_cache_key(instance.organization_id))
+
+
+@receiver(post_save, sender=Category)
+def invalidate_category_cache(sender, instance, **kwargs):
+    """
+    Un cambio de nombre afecta a todas las organizaciones con dispositivos en esa categoría.
+    (Al borrar una categoría, el borrado en cascada de sus dispositivos ya invalida.)
+    """
+    organization_ids = set(
+        Device.objects
+        .filter(category=instance, organization_id__isnull=False)
+        .values_list('organization_id', flat=True)
+        .distinct()
+    )
+    cache.delete_many([categories_cache_key(oid) for oid in organization_ids])
+    schedule_summary_refresh(organization_ids)
+
+
+@receiver(post_save, sender=Zone)
+def refresh_zone_summary(sender, instance, **kwargs):
+    """
+    El nombre de la zona también está copiado en dashboard_org_summary.
+    """
+    schedule_summary_refresh(
+        Device.objects
+        .filter(zone=instance, organization_id__isnull=False)
+        .values_list('organization_id', flat=True)
+        .distinct()
+    )
+
+
+@receiver([post_save, post_delete], sender=Organization)
+def invalidate_organization_cache(sender, instance, **kwargs):
+    """
+    Borra la organización cacheada por _get_organization.
+    """
+    cache.delete(organization_cache_key(instance.pk))
@@ -1,3 +1,113 @@
+from unittest import mock
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+
+from .models import Alert, Category, Device, DeviceSummary, Measurement, Organization, Zone
+from .views import dashboard_cache_key
+
+
+class DeviceOrganizationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.org = Organization.objects.create(name='Org A', email='a@example.com', password='!')
+        self.other = Organization.objects.create(name='Org B', email='b@example.com', password='!')
+        self.device = Device.objects.create(
+            name='Medidor', category=Category.objects.create(name='Cat'),
+            zone=Zone.objects.create(name='Zona'), max_consumption=10, organization=self.org,
+        )
+
+    def test_measurement_and_alert_copy_device_organization(self):
+        medicion = Measurement.objects.create(device=self.device, value=1)
+        alerta = Alert.objects.create(device=self.device, alert_type='MAINTENANCE', message='m')
+        self.assertEqual(medicion.organization_id, self.org.id)
+        self.assertEqual(alerta.organization_id, self.org.id)
+
+    def test_reassigning_device_recomputes_organization(self):
+        foreign_device = Device.objects.create(
+            name='Ajeno', category=self.device.category, zone=self.device.zone,
+            max_consumption=10, organization=self.other,
+        )
+        Alert.objects.create(device=foreign_device, alert_type='MAINTENANCE', message='de B')
+
+        # Como el formulario de cambio del admin: se carga la fila y se cambia solo el dispositivo
+        alerta = Alert.objects.get()
+        alerta.device = self.device
+        alerta.save()
+        self.assertEqual(Alert.objects.get().organization_id, self.org.id)
+        self.assertFalse(Alert.objects.filter(organization=self.other).exists())
+
+    def test_bulk_create_copies_device_organization(self):
+        Measurement.objects.bulk_create([Measurement(device=self.device, value=i) for i in range(3)])
+        Alert.objects.bulk_create([Alert(device=self.device, alert_type='MAINTENANCE', message='m')])
+        self.assertEqual(Measurement.objects.filter(organization=self.org).count(), 3)
+        self.assertFalse(Measurement.objects.filter(timestamp_str='').exists())
+        self.assertEqual(Alert.objects.filter(organization=self.org).count(), 1)
+
+    def test_changing_device_organization_propagates(self):
+        Measurement.objects.create(device=self.device, value=1)
+        Alert.objects.create(device=self.device, alert_type='MAINTENANCE', message='m')
+
+        device = Device.objects.get(pk=self.device.pk)
+        device.organization = self.other
+        device.save()
+
+        self.assertFalse(Measurement.objects.filter(organization=self.org).exists())
+        self.assertFalse(Alert.objects.filter(organization=self.org).exists())
+        self.assertEqual(Measurement.objects.filter(organization=self.other).count(), 1)
+        self.assertEqual(Alert.objects.filter(organization=self.other).count(), 1)
+
+    def test_summary_refresh_runs_once_per_transaction_and_is_rate_limited(self):
+        cache.set(dashboard_cache_key(self.org.id), {'cacheado': True})
+        with mock.patch.object(DeviceSummary, 'refresh', return_value=True) as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.device.name = 'Medidor 2'
+                self.device.save()
+                Device.objects.create(
+                    name='Otro', category=self.device.category, zone=self.device.zone,
+                    max_consumption=5, organization=self.org,
+                )
+            self.assertEqual(refresh.call_count, 1)
+            self.assertIsNone(cache.get(dashboard_cache_key(self.org.id)))
+
+            # Dentro del intervalo mínimo no se vuelve a refrescar, pero el dashboard se invalida igual
+            cache.set(dashboard_cache_key(self.org.id), {'cacheado': True})
+            with self.captureOnCommitCallbacks(execute=True):
+                self.device.save()
+            self.assertEqual(refresh.call_count, 1)
+            self.assertIsNone(cache.get(dashboard_cache_key(self.org.id)))
+
+
+class DashboardViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        categoria = Category.objects.create(name='Cat')
+        zona = Zone.objects.create(name='Zona')
+        self.org = Organization.objects.create(name='Org A', email='a@example.com', password='!')
+        other = Organization.objects.create(name='Org B', email='b@example.com', password='!')
+        self.device = Device.objects.create(
+            name='Propio', category=categoria, zone=zona, max_consumption=10, organization=self.org,
+        )
+        self.foreign_device = Device.objects.create(
+            name='Ajeno', category=categoria, zone=zona, max_consumption=10, organization=other,
+        )
+        # Misma sesión que deja login_view
+        session = self.client.session
+        session.update({'organization_id': self.org.id, 'organization_name': self.org.name, 'is_logged_in': True})
+        session.save()
+
+    def test_device_detail_of_another_organization_is_404(self):
+        self.assertEqual(self.client.get(reverse('device_detail', args=[self.device.id])).status_code, 200)
+        self.assertEqual(self.client.get(reverse('device_detail', args=[self.foreign_device.id])).status_code, 404)
+
+    def test_views_require_login(self):
+        self.client.post(reverse('logout'))
+        for name in ('dashboard', 'alerts', 'measurements', 'devices_list'):
+            self.assertRedirects(self.client.get(reverse(name)), reverse('login'), fetch_redirect_response=False)
 
-# Create your tests here.
+    def test_device_counts_only_include_own_organization(self):
+        response = self.client.get(reverse('devices_by_category'))
+        self.assertEqual(response.context['dispositivos_por_categoria'], {'Cat': 1})
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['dispositivos_por_zona'], {'Zona': 1})
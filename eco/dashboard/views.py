@@ -4,17 +4,54 @@ from datetime import timedelta
 
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.db.models import Count
+from django.db.models import Count, Q, Sum
 from django.utils import timezone
 from django.http import Http404
 
-from django.core.exceptions import FieldError
+from django.core.cache import cache
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 
 from django.contrib.auth import logout as auth_logout
 from django.views.decorators.http import require_POST
 
-from .models import Device, Measurement, Alert, Organization
+from .models import Category, Device, DeviceSummary, Measurement, Alert, Organization
+
+# Segundos que se reutiliza el contexto agregado del dashboard
+DASHBOARD_CACHE_TIMEOUT = 60
+
+
+# Segundos que se reutiliza el listado de categorías de una organización
+CATEGORIES_CACHE_TIMEOUT = 300
+
+
+# Segundos que se reutiliza la organización (id, nombre) resuelta desde la sesión
+ORGANIZATION_CACHE_TIMEOUT = 300
+
+
+# Tarjetas de severidad del dashboard -> valores de alert_type que cuentan para cada una
+SEVERITY_ALIASES = {
+    'grave': ('CRITICAL', 'GRAVE'),
+    'alto': ('HIGH', 'ALTO'),
+    'mediano': ('MEDIUM', 'MEDIANO'),
+}
+
+# Conteos de alertas (por tarjeta de severidad y por tipo) para un solo aggregate()
+ALERT_COUNT_AGGREGATES = {
+    **{card: Count('id', filter=Q(alert_type__in=aliases)) for card, aliases in SEVERITY_ALIASES.items()},
+    **{tipo: Count('id', filter=Q(alert_type=tipo)) for tipo, _ in Alert.ALERT_TYPES},
+}
+
+
+def organization_cache_key(organization_id):
+    return f"org:{organization_id}"
+
+
+def dashboard_cache_key(organization_id):
+    return f"dashboard:{organization_id}"
+
+
+def categories_cache_key(organization_id):
+    return f"cats:{organization_id}"
 
 
 def login_required(view_func):
@@ -39,10 +76,11 @@ def _get_organization(request):
     org = None
     org_id = request.session.get("organization_id")
     if org_id:
-        try:
-            org = Organization.objects.get(pk=org_id)
-        except Organization.DoesNotExist:
-            org = None
+        org = cache.get_or_set(
+            organization_cache_key(org_id),
+            lambda: Organization.objects.only('id', 'name').filter(pk=org_id).first(),
+            ORGANIZATION_CACHE_TIMEOUT,
+        )
 
     if org is None and request.user.is_authenticated:
         # Profile con FK organization
@@ -62,13 +100,9 @@ def logout_view(request):
     Cierra sesión (POST recomendado). Limpia request.session y desloguea al user de auth.
     Redirige a 'login'.
     """
-    # limpia la sesión completa (esto borra organization_id, is_logged_in, etc.)
-    request.session.flush()
-    # Si usás django auth también lo cerramos (no falla si no hay user)
-    try:
-        auth_logout(request)
-    except Exception:
-        pass
+    # auth_logout hace un único session.flush() (borra organization_id, is_logged_in, etc. y rota la clave)
+    # y además cierra la sesión de django auth si hay user; con un user anónimo no falla
+    auth_logout(request)
     messages.info(request, "Sesión cerrada.")
     return redirect('login')
 
@@ -76,135 +110,90 @@ def logout_view(request):
 @login_required
 def dashboard(request):
     organization_name = request.session.get('organization_name', '')
-    org = _get_organization(request)
-    organization_id = org.id if org else request.session.get('organization_id')
+    organization_id = request.organization_id
 
     if not organization_id:
         messages.error(request, 'Sesión inválida. Por favor, inicia sesión nuevamente.')
         return redirect('login')
 
-    # --- Dispositivos por categoría (dict: nombre -> conteo) ---
-    try:
-        categorias_qs = (
-            Device.objects
-            .filter(organization_id=organization_id)
-            .values('category__name')
-            .annotate(conteo=Count('id'))
-        )
-        dispositivos_por_categoria = {c['category__name'] or 'Sin categoría': c['conteo'] for c in categorias_qs}
-    except FieldError:
-        categorias_qs = (
-            Device.objects
-            .filter(organization_id=organization_id)
-            .values('category')
-            .annotate(conteo=Count('id'))
-        )
-        dispositivos_por_categoria = {c.get('category') or 'Sin categoría': c['conteo'] for c in categorias_qs}
-
-    # --- Dispositivos por zona (dict: nombre -> conteo) ---
-    try:
-        zonas_qs = (
-            Device.objects
-            .filter(organization_id=organization_id)
-            .values('zone__name')
-            .annotate(conteo=Count('id'))
-        )
-        dispositivos_por_zona = {z['zone__name'] or 'Sin zona': z['conteo'] for z in zonas_qs}
-    except FieldError:
-        zonas_qs = (
-            Device.objects
-            .filter(organization_id=organization_id)
-            .values('zone')
-            .annotate(conteo=Count('id'))
-        )
-        dispositivos_por_zona = {z.get('zone') or 'Sin zona': z['conteo'] for z in zonas_qs}
+    # El contexto agregado se cachea por organización (se invalida en dashboard/signals.py)
+    context = cache.get_or_set(
+        dashboard_cache_key(organization_id),
+        lambda: _build_dashboard_context(organization_id),
+        DASHBOARD_CACHE_TIMEOUT,
+    )
+    if not organization_name:
+        org = _get_organization(request)
+        organization_name = org.name if org else "Global"
+    context = {
+        **context,
+        'organization_name': organization_name,
+        # Bandera que deja login_view para mostrar la bienvenida una sola vez
+        'bienvenida': request.session.pop('flash_welcome', False),
+    }
 
-    # --- Alertas por severidad (normalizamos keys) ---
-    severidad_counts = {}
-    try:
-        sever_qs = (
-            Alert.objects
-            .filter(device__organization_id=organization_id)
-            .values('alert_type')
-            .annotate(conteo=Count('id'))
-        )
-        for r in sever_qs:
-            key = (r.get('alert_type') or '').upper()
-            severidad_counts[key] = r['conteo']
-    except FieldError:
-        sever_qs = (
-            Alert.objects
-            .filter(device__organization_id=organization_id)
-            .values('severity')
-            .annotate(conteo=Count('id'))
-        )
-        for r in sever_qs:
-            key = (r.get('severity') or '').upper()
-            severidad_counts[key] = r['conteo']
+    return render(request, 'dashboard.html', context)
 
-    # Mapeo a variables de tarjeta (soporta CRITICAL/HIGH/MEDIUM o GRAVE/ALTO/MEDIANO)
-    conteo_grave   = severidad_counts.get('CRITICAL') or severidad_counts.get('GRAVE') or 0
-    conteo_alto    = severidad_counts.get('HIGH') or severidad_counts.get('ALTO') or 0
-    conteo_mediano = severidad_counts.get('MEDIUM') or severidad_counts.get('MEDIANO') or 0
 
-    # --- Alertas recientes (normalizamos alert_type para la plantilla) ---
-    raw_alerts_qs = (
+def _build_dashboard_context(organization_id):
+    """
+    Arma el contexto del dashboard (conteos, alertas y mediciones recientes) para una organización.
+    """
+    # --- Dispositivos por categoría y por zona (resumen precalculado, se acumula en Python) ---
+    combinados = (
+        DeviceSummary.objects
+        .filter(organization_id=organization_id)
+        .values('category_name', 'zone_name', 'device_count')
+    )
+    dispositivos_por_categoria = {}
+    dispositivos_por_zona = {}
+    for c in combinados:
+        categoria = c['category_name'] or 'Sin categoría'
+        zona = c['zone_name'] or 'Sin zona'
+        dispositivos_por_categoria[categoria] = dispositivos_por_categoria.get(categoria, 0) + c['device_count']
+        dispositivos_por_zona[zona] = dispositivos_por_zona.get(zona, 0) + c['device_count']
+
+    # --- Alertas por tipo y por severidad (una sola consulta con COUNT ... FILTER) ---
+    conteos = Alert.objects.filter(organization_id=organization_id).aggregate(**ALERT_COUNT_AGGREGATES)
+    severidad_counts = {tipo: conteos[tipo] for tipo, _ in Alert.ALERT_TYPES if conteos[tipo]}
+
+    # --- Alertas recientes ---
+    alertas_recientes = list(
         Alert.objects
-        .filter(device__organization_id=organization_id)
+        .filter(organization_id=organization_id)
         .select_related('device')
+        .only('id', 'alert_type', 'message', 'created_at', 'device__id', 'device__name')
         .order_by('-created_at')[:10]
     )
 
-    alertas_recientes = []
-    for a in raw_alerts_qs:
-        at = getattr(a, 'alert_type', None) or getattr(a, 'severity', None) or ''
-        setattr(a, 'alert_type', at)
-        alertas_recientes.append(a)
-
     # --- Últimas mediciones: transformadas a dicts con claves esperadas por template ---
     ultimas_med_qs = (
         Measurement.objects
-        .filter(device__organization_id=organization_id)
-        .select_related('device')
+        .filter(organization_id=organization_id)
+        .values('timestamp_str', 'value', 'device__name', 'device_id')
         .order_by('-timestamp')[:10]
     )
 
-    ultimas_mediciones = []
-    for m in ultimas_med_qs:
-        # fecha_hora: intenta varios nombres comunes
-        fecha = getattr(m, 'fecha_hora', None) or getattr(m, 'timestamp', None) or getattr(m, 'measured_at', None) or getattr(m, 'created_at', None)
-        fecha_str = fecha.strftime("%Y-%m-%d %H:%M:%S") if fecha else ''
-        # valor: intenta varios nombres
-        valor = getattr(m, 'valor', None)
-        if valor is None:
-            valor = getattr(m, 'value', None)
-        if valor is None:
-            valor = getattr(m, 'reading', None)
-        # dispositivo
-        dispositivo_nombre = getattr(m.device, 'name', str(getattr(m, 'device', '')))
-        dispositivo_id = getattr(m.device, 'id', None)
-
-        ultimas_mediciones.append({
-            'fecha_hora': fecha_str,
-            'valor': valor,
-            'dispositivo': dispositivo_nombre,
-            'device_id': dispositivo_id,
-        })
-
-    context = {
-        'organization_name': organization_name or (org.name if org else "Global"),
+    ultimas_mediciones = [
+        {
+            'fecha_hora': r['timestamp_str'],
+            'valor': r['value'],
+            'dispositivo': r['device__name'],
+            'device_id': r['device_id'],
+        }
+        for r in ultimas_med_qs
+    ]
+
+    return {
         'dispositivos_por_categoria': dispositivos_por_categoria,
         'dispositivos_por_zona': dispositivos_por_zona,
         'alertas_por_severidad': severidad_counts,
         'alertas_recientes': alertas_recientes,
         'ultimas_mediciones': ultimas_mediciones,
-        'conteo_grave': conteo_grave,
-        'conteo_alto': conteo_alto,
-        'conteo_mediano': conteo_mediano,
+        # conteo_grave, conteo_alto, conteo_mediano
+        **{f'conteo_{card}': conteos[card] for card in SEVERITY_ALIASES},
     }
 
-    return render(request, 'dashboard.html', context)
-
 
 def home(request):
     return render(request, 'home.html')
@@ -212,28 +201,19 @@ def home(request):
 
 @login_required
 def devices_by_category(request):
-    org = _get_organization(request)
-    organization_id = org.id if org else request.session.get('organization_id')
+    organization_id = request.organization_id
     if not organization_id:
         messages.error(request, 'Sesión inválida. Por favor, inicia sesión nuevamente.')
         return redirect('login')
 
-    try:
-        categorias = (
-            Device.objects
-            .filter(organization_id=organization_id)
-            .values('category__name')
-            .annotate(conteo=Count('id'))
-        )
-        dispositivos_por_categoria = {c['category__name'] or 'Sin categoría': c['conteo'] for c in categorias}
-    except FieldError:
-        categorias = (
-            Device.objects
-            .filter(organization_id=organization_id)
-            .values('category')
-            .annotate(conteo=Count('id'))
-        )
-        dispositivos_por_categoria = {c.get('category') or 'Sin categoría': c['conteo'] for c in categorias}
+    # Misma fuente que el dashboard (dashboard_org_summary) para que los conteos coincidan
+    categorias = (
+        DeviceSummary.objects
+        .filter(organization_id=organization_id)
+        .values('category_name')
+        .annotate(conteo=Sum('device_count'))
+    )
+    dispositivos_por_categoria = {c['category_name'] or 'Sin categoría': c['conteo'] for c in categorias}
 
     return render(request, 'devices_by_category.html', {
         'dispositivos_por_categoria': dispositivos_por_categoria
@@ -242,28 +222,19 @@ def devices_by_category(request):
 
 @login_required
 def devices_by_zone(request):
-    org = _get_organization(request)
-    organization_id = org.id if org else request.session.get('organization_id')
+    organization_id = request.organization_id
     if not organization_id:
         messages.error(request, 'Sesión inválida. Por favor, inicia sesión nuevamente.')
         return redirect('login')
 
-    try:
-        zonas = (
-            Device.objects
-            .filter(organization_id=organization_id)
-            .values('zone__name')
-            .annotate(conteo=Count('id'))
-        )
-        dispositivos_por_zona = {z['zone__name'] or 'Sin zona': z['conteo'] for z in zonas}
-    except FieldError:
-        zonas = (
-            Device.objects
-            .filter(organization_id=organization_id)
-            .values('zone')
-            .annotate(conteo=Count('id'))
-        )
-        dispositivos_por_zona = {z.get('zone') or 'Sin zona': z['conteo'] for z in zonas}
+    # Misma fuente que el dashboard (dashboard_org_summary) para que los conteos coincidan
+    zonas = (
+        DeviceSummary.objects
+        .filter(organization_id=organization_id)
+        .values('zone_name')
+        .annotate(conteo=Sum('device_count'))
+    )
+    dispositivos_por_zona = {z['zone_name'] or 'Sin zona': z['conteo'] for z in zonas}
 
     return render(request, 'devices_by_zone.html', {
         'dispositivos_por_zona': dispositivos_por_zona
@@ -272,16 +243,16 @@ def devices_by_zone(request):
 
 @login_required
 def alerts(request):
-    org = _get_organization(request)
-    organization_id = org.id if org else request.session.get('organization_id')
+    organization_id = request.organization_id
     if not organization_id:
         messages.error(request, 'Sesión inválida. Por favor, inicia sesión nuevamente.')
         return redirect('login')
 
     alerts_qs = (
         Alert.objects
-        .filter(device__organization_id=organization_id)
+        .filter(organization_id=organization_id)
         .select_related('device')
+        .only('id', 'alert_type', 'message', 'is_resolved', 'created_at', 'status', 'device__id', 'device__name')
         .order_by('-created_at')
     )
 
@@ -293,15 +264,8 @@ def alerts(request):
     except (PageNotAnInteger, EmptyPage):
         alerts_page = paginator.page(1)
 
-    # Normalizar alert_type en cada objeto (para compatibilidad con plantilla)
-    alerts_list = []
-    for a in alerts_page:
-        at = getattr(a, 'alert_type', None) or getattr(a, 'severity', None) or ''
-        setattr(a, 'alert_type', at)
-        alerts_list.append(a)
-
     return render(request, 'alerts.html', {
-        'alertas': alerts_list,
+        'alertas': alerts_page,
         'paginator': paginator,
         'page_obj': alerts_page,
     })
@@ -309,8 +273,7 @@ def alerts(request):
 
 @login_required
 def measurements(request):
-    org = _get_organization(request)
-    organization_id = org.id if org else request.session.get('organization_id')
+    organization_id = request.organization_id
     if not organization_id:
         messages.error(request, 'Sesión inválida. Por favor, inicia sesión nuevamente.')
         return redirect('login')
@@ -318,37 +281,11 @@ def measurements(request):
     # Queryset original (para plantillas que esperan objetos)
     measurements_qs = (
         Measurement.objects
-        .filter(device__organization_id=organization_id)
+        .filter(organization_id=organization_id)
         .select_related('device')
         .order_by('-timestamp')
     )
 
-    # --- Serializamos una lista de dicts (para plantillas que esperan fecha/valor en claves específicas) ---
-    ultimas_mediciones = []
-    for m in measurements_qs[:50]:  # serializamos las primeras 50 para la tabla/paginado posterior
-        fecha = getattr(m, 'fecha_hora', None) or getattr(m, 'timestamp', None) or getattr(m, 'measured_at', None) or getattr(m, 'created_at', None)
-        fecha_str = fecha.strftime("%Y-%m-%d %H:%M:%S") if fecha else ''
-
-        valor = getattr(m, 'valor', None)
-        if valor is None:
-            valor = getattr(m, 'value', None)
-        if valor is None:
-            valor = getattr(m, 'reading', None)
-        # fallback a string para evitar mostrar vacío
-        if valor is None:
-            valor = ''
-
-        dispositivo_nombre = getattr(m.device, 'name', str(getattr(m, 'device', '')))
-        dispositivo_id = getattr(m.device, 'id', None)
-
-        ultimas_mediciones.append({
-            'fecha_hora': fecha_str,
-            'valor': valor,
-            'dispositivo': dispositivo_nombre,
-            'device_id': dispositivo_id,
-            'raw': m,  # opcional: dejo el objeto original por si lo necesitas en la plantilla
-        })
-
     # Paginación sobre el queryset original (mantiene comportamiento actual)
     page = request.GET.get('page', 1)
     paginator = Paginator(measurements_qs, 50)
@@ -359,7 +296,6 @@ def measurements(request):
 
     return render(request, 'measurements.html', {
         'mediciones': measurements_page,      # queryset paginado (m.device, m.timestamp, m.value...)
-        'ultimas_mediciones': ultimas_mediciones,  # lista serializada con fecha/valor/dispositivo
         'paginator': paginator,
         'page_obj': measurements_page,
     })
@@ -367,26 +303,32 @@ def measurements(request):
 
 @login_required
 def devices_list(request):
-    org = _get_organization(request)
-    organization_id = org.id if org else request.session.get('organization_id')
+    organization_id = request.organization_id
     if not organization_id:
         messages.error(request, 'Sesión inválida. Por favor, inicia sesión nuevamente.')
         return redirect('login')
 
     category = request.GET.get('category', '')
-    # intentar recuperar categorías tanto si category es FK (category__name) o campo simple
-    try:
-        categories = Device.objects.filter(organization_id=organization_id).values_list('category__name', flat=True).distinct()
-    except FieldError:
-        categories = Device.objects.filter(organization_id=organization_id).values_list('category', flat=True).distinct()
+    # Categorías usadas por la organización (cacheadas, se invalidan en dashboard/signals.py)
+    categories = cache.get_or_set(
+        categories_cache_key(organization_id),
+        lambda: list(
+            Category.objects
+            .filter(device__organization_id=organization_id)
+            .values_list('name', flat=True)
+            .distinct()
+        ),
+        CATEGORIES_CACHE_TIMEOUT,
+    )
 
-    devices = Device.objects.filter(organization_id=organization_id)
+    devices = (
+        Device.objects
+        .filter(organization_id=organization_id)
+        .select_related('category', 'zone')
+        .only('id', 'name', 'max_consumption', 'status', 'category__name', 'zone__name')
+    )
     if category:
-        # intentamos filtrar por category__name y si falla, por category directo
-        try:
-            devices = devices.filter(category__name=category)
-        except FieldError:
-            devices = devices.filter(category=category)
+        devices = devices.filter(category__name=category)
 
     return render(request, 'devices_list.html', {
         'dispositivos': devices,
@@ -397,8 +339,7 @@ def devices_list(request):
 
 @login_required
 def device_detail(request, id):
-    org = _get_organization(request)
-    organization_id = org.id if org else request.session.get('organization_id')
+    organization_id = request.organization_id
     if not organization_id:
         messages.error(request, 'Sesión inválida. Por favor, inicia sesión nuevamente.')
         return redirect('login')
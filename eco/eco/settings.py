@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -50,6 +51,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'dashboard.middleware.OrganizationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -104,6 +106,49 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Cache and sessions
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Con REDIS_URL (p. ej. unix:///run/redis/redis.sock o redis://127.0.0.1:6379/0) caché y sesiones van a Redis;
+# sin él la caché es memoria local de cada proceso (no compartida entre workers), así que las sesiones
+# quedan en la base de datos (backend por defecto): una sesión cacheada por proceso sobreviviría a un logout
+# hecho en otro worker.
+
+REDIS_URL = os.environ.get('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+
+SESSION_CACHE_ALIAS = 'default'
+
+# Los mensajes (django.contrib.messages) viajan firmados en una cookie: nunca escriben en la sesión
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/5.2/topics/auth/passwords/
+# Argon2id (requiere argon2-cffi) para hashes nuevos; el resto solo para verificar hashes existentes
+
+PASSWORD_HASHERS = [
+    'login.hashers.TunedArgon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class LoginConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'login'
+
+    def ready(self):
+        # Registra los receivers de invalidación de caché
+        from . import signals  # noqa: F401
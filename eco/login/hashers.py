@@ -0,0 +1,11 @@
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id con costos fijados para el servidor de despliegue (~250 ms por verificación).
+    Mantiene el algoritmo 'argon2': los hashes con otros parámetros se actualizan al iniciar sesión.
+    """
+    time_cost = 2
+    memory_cost = 64 * 1024  # KiB
+    parallelism = 4
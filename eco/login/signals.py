@@ -0,0 +1,17 @@
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from dashboard.models import Organization
+from .views import auth_cache_key
+
+
+@receiver([post_save, post_delete], sender=Organization)
+def invalidate_auth_cache(sender, instance, **kwargs):
+    """
+    Borra los datos de autenticación cacheados de la organización (p. ej. al cambiar la contraseña),
+    con el email actual y con el que tenía al cargarse, por si cambió.
+    """
+    emails = {instance.email, instance.__dict__.get('_loaded_email', instance.email)}
+    cache.delete_many([auth_cache_key(email) for email in emails])
+    instance._loaded_email = instance.email
@@ -1,3 +1,98 @@
-from django.test import TestCase
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils.crypto import salted_hmac
 
-# Create your tests here.
+from dashboard.models import Organization
+from .views import INVALID_CREDENTIALS, LOGIN_IN_PROGRESS, LOGIN_MAX_FAILURES, auth_cache_key
+
+
+class LoginTests(TestCase):
+    email = 'org@example.com'
+    password = 'secreta'
+
+    def setUp(self):
+        cache.clear()
+        self.organization = Organization.objects.create(
+            name='Org', email=self.email, password=make_password(self.password),
+        )
+
+    def login(self, email=None, password=None, client=None):
+        return (client or self.client).post(reverse('login'), {
+            'email': self.email if email is None else email,
+            'password': self.password if password is None else password,
+        })
+
+    def test_lockout_after_max_failures(self):
+        for _ in range(LOGIN_MAX_FAILURES):
+            self.assertEqual(self.login(password='incorrecta').context['error_message'], INVALID_CREDENTIALS)
+
+        # Bloqueado incluso con la contraseña correcta hasta que pase la ventana
+        response = self.login()
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Demasiados intentos')
+        self.assertNotIn('is_logged_in', self.client.session)
+
+    def test_unknown_email_and_wrong_password_get_the_same_error(self):
+        unknown = self.login(email='nadie@example.com')
+        wrong = self.login(password='incorrecta')
+        for response in (unknown, wrong):
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.context['error_message'], INVALID_CREDENTIALS)
+            self.assertNotIn('is_logged_in', self.client.session)
+
+    def test_login_with_uppercased_email(self):
+        response = self.login(email='  ORG@Example.COM ')
+        self.assertRedirects(response, reverse('dashboard'), fetch_redirect_response=False)
+        self.assertEqual(self.client.session['organization_id'], self.organization.id)
+
+    def test_credentials_are_not_cached_without_shared_cache(self):
+        self.assertEqual(self.login().status_code, 302)
+        self.assertIsNone(cache.get(auth_cache_key(self.email)))
+
+    # REDIS_URL solo activa la caché de credenciales; la caché de los tests sigue siendo LocMemCache
+    @override_settings(REDIS_URL='redis://compartida')
+    def test_email_change_drops_credentials_cached_under_old_email(self):
+        self.assertEqual(self.login().status_code, 302)
+        self.client.post(reverse('logout'))
+
+        organization = Organization.objects.get(pk=self.organization.pk)
+        organization.email = 'nuevo@example.com'
+        organization.save()
+        self.assertEqual(self.login().context['error_message'], INVALID_CREDENTIALS)
+        self.assertEqual(self.login(email='nuevo@example.com').status_code, 302)
+
+    @override_settings(REDIS_URL='redis://compartida')
+    def test_password_change_invalidates_cached_credentials(self):
+        self.assertEqual(self.login().status_code, 302)
+        self.client.post(reverse('logout'))
+
+        self.organization.password = make_password('nueva')
+        self.organization.save()
+        self.assertEqual(self.login().context['error_message'], INVALID_CREDENTIALS)
+        self.assertEqual(self.login(password='nueva').status_code, 302)
+
+    def test_concurrent_identical_login_is_rejected_without_waiting(self):
+        # Simula otro request verificando ya el mismo email y contraseña
+        digest = salted_hmac('login.verify_password', f'{self.email}:{self.password}').hexdigest()
+        cache.set(f"auth:inflight:{digest}", 'busy')
+
+        response = self.login()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.context['error_message'], LOGIN_IN_PROGRESS)
+        self.assertNotContains(response, INVALID_CREDENTIALS, status_code=429)
+        self.assertNotIn('is_logged_in', self.client.session)
+
+    def test_fresh_clients_get_their_own_csrf_token(self):
+        # Dos visitantes nuevos con verificación CSRF real: cada GET debe emitir su propia cookie y token
+        for _ in range(2):
+            client = Client(enforce_csrf_checks=True)
+            response = client.get(reverse('login'))
+            token = client.cookies['csrftoken'].value
+            self.assertIn(b'csrfmiddlewaretoken', response.content)
+
+            response = client.post(reverse('login'), {
+                'email': self.email, 'password': self.password, 'csrfmiddlewaretoken': token,
+            })
+            self.assertRedirects(response, reverse('dashboard'), fetch_redirect_response=False)
@@ -1,45 +1,165 @@
+import hashlib
+
+from django.conf import settings
 from django.shortcuts import render, redirect
-from django.contrib import messages
-from django.contrib.auth.hashers import check_password
+from django.contrib.auth.hashers import check_password, get_hasher, make_password
+from django.core.cache import cache
+from django.utils.crypto import salted_hmac
+from django.views.decorators.cache import cache_page
 from dashboard.models import Organization
 
+# Segundos que se reutilizan los datos de autenticación (id, nombre, hash) de una organización
+AUTH_CACHE_TIMEOUT = 300
+
+# Segundos máximos que una verificación en curso bloquea a otras con el mismo email y contraseña
+AUTH_INFLIGHT_TIMEOUT = 5
+
+# Intentos fallidos permitidos por (IP, email) dentro de la ventana, antes de cortar sin verificar
+LOGIN_MAX_FAILURES = 10
+LOGIN_FAILURES_WINDOW = 60
+
+# Hasher principal (el primero de PASSWORD_HASHERS), usado directamente en el login
+_HASHER = get_hasher('default')
+
+# Hash de referencia (calculado una sola vez, con el mismo hasher que lo verifica) para cuando el email
+# no existe: así el tiempo de respuesta no revela qué cuentas existen
+DUMMY_HASH = _HASHER.encode('!' * 32, _HASHER.salt())
+
+INVALID_CREDENTIALS = 'Credenciales inválidas'
+
+LOGIN_IN_PROGRESS = 'Ya hay un inicio de sesión en curso. Intenta de nuevo en unos segundos.'
+
+# Contraseñas más largas se rechazan sin hashear (acota el costo del KDF por request)
+MAX_PASSWORD_LENGTH = 1024
+
+
+def auth_cache_key(email):
+    return f"org:credentials:{hashlib.sha256(email.encode()).hexdigest()}"
+
+
+def _get_credentials(email):
+    """
+    Devuelve (id, name, password) de la organización con ese email, o None si no existe.
+    Solo se cachea con una caché compartida (REDIS_URL): con la memoria local de cada proceso,
+    un cambio de contraseña invalidaría la copia de un único worker y los demás seguirían
+    aceptando la contraseña anterior.
+    """
+    if not settings.REDIS_URL:
+        return Organization.objects.credentials_for(email)
+    key = auth_cache_key(email)
+    credentials = cache.get(key)
+    if credentials is None:
+        # Namedtuple: sin instanciar el modelo ni pasar por DoesNotExist
+        credentials = Organization.objects.credentials_for(email)
+        if credentials is None:
+            return None
+        cache.set(key, credentials, AUTH_CACHE_TIMEOUT)
+    return credentials
+
+
+def _password_upgrader(organization_id, email):
+    """
+    Setter para check_password: guarda el hash con el hasher/costos actuales si el almacenado quedó viejo.
+    """
+    def setter(raw_password):
+        Organization.objects.filter(pk=organization_id).update(password=make_password(raw_password))
+        # update() no dispara post_save: invalidamos a mano
+        cache.delete(auth_cache_key(email))
+    return setter
+
+
+def _check_password(email, password, credentials):
+    """
+    Los hashes del algoritmo principal se verifican directo con _HASHER, sin la identificación/dispatch
+    de check_password; los de otros algoritmos (legado) pasan por check_password, que además los migra.
+    """
+    encoded = credentials.password
+    upgrade = _password_upgrader(credentials.id, email)
+    if not encoded.startswith(f'{_HASHER.algorithm}$'):
+        return check_password(password, encoded, setter=upgrade)
+    valid = _HASHER.verify(password, encoded)
+    if valid and _HASHER.must_update(encoded):
+        upgrade(password)
+    return valid
+
+
+def _verify_password(email, password, credentials):
+    """
+    check_password con "single flight": ante requests concurrentes con el mismo email y contraseña
+    (p. ej. doble envío del formulario), solo uno calcula el KDF. Devuelve None para los demás,
+    que responden de inmediato sin ocupar un worker esperando.
+    """
+    # HMAC con SECRET_KEY: la clave de caché no expone un hash reversible de la contraseña
+    digest = salted_hmac('login.verify_password', f'{email}:{password}').hexdigest()
+    inflight_key = f"auth:inflight:{digest}"
+
+    if not cache.add(inflight_key, 'busy', AUTH_INFLIGHT_TIMEOUT):
+        return None
+    try:
+        return _check_password(email, password, credentials)
+    finally:
+        cache.delete(inflight_key)
+
+
+def _login_failures_key(request, email):
+    ip = request.META.get('REMOTE_ADDR', '')
+    return f"login:fails:{hashlib.sha256(f'{ip}:{email}'.encode()).hexdigest()}"
+
+
+def _register_login_failure(key):
+    if not cache.add(key, 1, LOGIN_FAILURES_WINDOW):
+        try:
+            cache.incr(key)
+        except ValueError:
+            # La clave expiró entre add() e incr()
+            cache.set(key, 1, LOGIN_FAILURES_WINDOW)
+
+
 def login_view(request):
     if request.method == 'POST':
-        email = request.POST.get('email')
-        password = request.POST.get('password')
+        # Los emails se guardan en minúsculas (Organization.save)
+        email = (request.POST.get('email') or '').strip().lower()
+        password = request.POST.get('password') or ''
+
+        # Entradas imposibles (vacías, sin '@', contraseñas enormes): sin consulta ni KDF
+        if '@' not in email or not 1 <= len(password) <= MAX_PASSWORD_LENGTH:
+            return render(request, 'login.html', {'error_message': INVALID_CREDENTIALS})
+
+        # Demasiados fallos recientes: se corta antes de la consulta y del KDF
+        failures_key = _login_failures_key(request, email)
+        if (cache.get(failures_key) or 0) >= LOGIN_MAX_FAILURES:
+            return render(request, 'login.html', {'error_message': 'Demasiados intentos. Intenta de nuevo en un minuto.'})
         
-        try:
-            # Buscar la organización por email
-            organization = Organization.objects.get(email=email)
-            
-            # Verificar la contraseña
-            if check_password(password, organization.password):
-                # Guardar información de la organización en la sesión
-                request.session['organization_id'] = organization.id
-                request.session['organization_name'] = organization.name
-                request.session['is_logged_in'] = True
-                
-                messages.success(request, f'Bienvenido, {organization.name}')
-                return redirect('dashboard')
-            else:
-                return render(request, 'login.html', {'error_message': 'Contraseña incorrecta'})
-                
-        except Organization.DoesNotExist:
-            return render(request, 'login.html', {'error_message': 'No existe una organización con ese correo electrónico'})
+        # Buscar la organización por email
+        organization = _get_credentials(email)
+        if organization is None:
+            _HASHER.verify(password, DUMMY_HASH)
+            _register_login_failure(failures_key)
+            return render(request, 'login.html', {'error_message': INVALID_CREDENTIALS})
+
+        # Verificar la contraseña
+        valid = _verify_password(email, password, organization)
+        if valid is None:
+            # Ya hay una verificación idéntica en curso (p. ej. doble clic): la contraseña no se verificó,
+            # así que no se informa como inválida
+            return render(request, 'login.html', {'error_message': LOGIN_IN_PROGRESS}, status=429)
+        if valid:
+            # Guardar información de la organización en la sesión
+            request.session.update({
+                'organization_id': organization.id,
+                'organization_name': organization.name,
+                'is_logged_in': True,
+                'flash_welcome': True,
+            })
+            return redirect('dashboard')
+        else:
+            _register_login_failure(failures_key)
+            return render(request, 'login.html', {'error_message': INVALID_CREDENTIALS})
     
     return render(request, 'login.html')
 
-def logout_view(request):
-    # Eliminar datos de sesión
-    if 'organization_id' in request.session:
-        del request.session['organization_id']
-    if 'organization_name' in request.session:
-        del request.session['organization_name']
-    if 'is_logged_in' in request.session:
-        del request.session['is_logged_in']
-    
-    messages.success(request, 'Has cerrado sesión correctamente')
-    return redirect('home')
 
+@cache_page(60 * 60)
 def password_reset_view(request):
-    return render(request, 'password-reset.html')
\ No newline at end of file
+    return render(request, 'password-reset.html')
+
@@ -1,3 +1,25 @@
+from django.contrib.auth.hashers import check_password
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from dashboard.models import Organization
+
+
+class RegisterOrganizationTests(TestCase):
+    def test_registration_stores_the_password_hash(self):
+        response = self.client.post(reverse('register'), {
+            'name': 'Org', 'email': 'Org@Example.com ', 'password': 'secreta', 'confirm_password': 'secreta',
+        })
+        self.assertRedirects(response, reverse('register'))
+        # El hash queda guardado al terminar el request, sin trabajo en segundo plano
+        organization = Organization.objects.get(email='org@example.com')
+        self.assertTrue(check_password('secreta', organization.password))
+
+    def test_duplicate_email_differing_in_case_is_rejected(self):
+        Organization.objects.create(name='Org', email='org@example.com', password='!')
+        response = self.client.post(reverse('register'), {
+            'name': 'Otra', 'email': 'ORG@example.com', 'password': 'x', 'confirm_password': 'x',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertFormError(response.context['form'], 'email', 'Ya existe una organización con ese correo electrónico.')
+        self.assertEqual(Organization.objects.count(), 1)
@@ -1,13 +1,26 @@
+import hmac
+
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django import forms
 from dashboard.models import Organization
 from django.contrib.auth.hashers import make_password
 
+class RawPasswordField(forms.CharField):
+    """
+    Contraseña tal como llegó: solo exige que no esté vacía.
+    Sin to_python/validadores (no recorta espacios, igual que el login, que usa el valor crudo).
+    """
+    def clean(self, value):
+        if not value:
+            raise forms.ValidationError(self.error_messages['required'], code='required')
+        return value
+
+
 # Definir el formulario dentro de views.py
 class OrganizationRegistrationForm(forms.ModelForm):
-    password = forms.CharField(widget=forms.PasswordInput(attrs={'class': 'form-control'}))
-    confirm_password = forms.CharField(widget=forms.PasswordInput(attrs={'class': 'form-control'}))
+    password = RawPasswordField(widget=forms.PasswordInput(attrs={'class': 'form-control'}))
+    confirm_password = RawPasswordField(widget=forms.PasswordInput(attrs={'class': 'form-control'}))
     
     class Meta:
         model = Organization
@@ -22,23 +35,38 @@ class OrganizationRegistrationForm(forms.ModelForm):
             'email': forms.EmailInput(attrs={'class': 'form-control'}),
         }
     
+    def clean_email(self):
+        # Normalizado igual que en Organization.save, así la validación de unicidad compara lo que se guarda
+        email = self.cleaned_data['email'].strip().lower()
+        # SELECT 1 ... LIMIT 1 sobre el índice de email; si falla, Django omite las validaciones
+        # de unicidad/restricciones de este campo y el usuario ve un único mensaje
+        if Organization.objects.filter(email=email).exists():
+            raise forms.ValidationError('Ya existe una organización con ese correo electrónico.')
+        return email
+
     def clean(self):
         cleaned_data = super().clean()
         password = cleaned_data.get('password')
         confirm_password = cleaned_data.get('confirm_password')
         
-        if password and confirm_password and password != confirm_password:
+        # Comparación en tiempo constante (compare_digest solo acepta str ASCII, por eso se codifica)
+        if password and confirm_password and not hmac.compare_digest(password.encode(), confirm_password.encode()):
             self.add_error('confirm_password', 'Las contraseñas no coinciden')
         
         return cleaned_data
     
     def save(self, commit=True):
         organization = super().save(commit=False)
+        # Síncrono: sin una cola durable, un hash diferido se perdería si el proceso muere
         organization.password = make_password(self.cleaned_data['password'])
         if commit:
             organization.save()
         return organization
 
+# Formulario vacío compartido por todos los GET: sin datos no se valida ni se modifica al renderizarlo,
+# así se evita copiar (deepcopy) campos y widgets en cada request
+_UNBOUND_FORM = OrganizationRegistrationForm()
+
 # Vista para el registro
 def register_organization(request):
     if request.method == 'POST':
@@ -48,6 +76,6 @@ def register_organization(request):
             messages.success(request, 'Organización registrada exitosamente')
             return redirect('register')
     else:
-        form = OrganizationRegistrationForm()
+        form = _UNBOUND_FORM
     
     return render(request, 'register.html', {'form': form})
\ No newline at end of file